@@ -6,9 +6,18 @@ Napalm driver for F5.
 Read https://napalm.readthedocs.io for more information.
 """
 import base64
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import hashlib
 import os
+import re
 import importlib.util
+import mmap
+import socket
 import sys
+import threading
+import time
 
 import bigsuds
 from napalm.base.base import NetworkDriver
@@ -20,12 +29,169 @@ spec.loader.exec_module(module)
 from f5.bigip import ManagementRoot
 from napalm.base.exceptions import ConnectionException, \
     MergeConfigException, ReplaceConfigException
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from napalm_f5.env import LIMITS, ALERT
 from napalm_f5.exceptions import CommitConfigException, DiscardConfigException
 
+# iControl interface statistic types and the NAPALM counters they feed.
+_COUNTER_MAP = {
+    'STATISTIC_ERRORS_IN': 'rx_errors',
+    'STATISTIC_ERRORS_OUT': 'tx_errors',
+    'STATISTIC_DROPPED_PACKETS_IN': 'rx_discards',
+    'STATISTIC_DROPPED_PACKETS_OUT': 'tx_discards',
+    'STATISTIC_BYTES_IN': 'rx_octets',
+    'STATISTIC_BYTES_OUT': 'tx_octets',
+    'STATISTIC_PACKETS_IN': 'rx_unicast_packets',
+    'STATISTIC_PACKETS_OUT': 'tx_unicast_packets',
+    'STATISTIC_MULTICASTS_IN': 'rx_multicast_packets',
+    'STATISTIC_MULTICASTS_OUT': 'tx_multicast_packets',
+}
+
+# Per-interface counters reported as -1 until a statistic fills them in.
+_DEFAULT_COUNTERS = {
+    'tx_errors': -1,
+    'rx_errors': -1,
+    'tx_discards': -1,
+    'rx_discards': -1,
+    'tx_octets': -1,
+    'rx_octets': -1,
+    'tx_unicast_packets': -1,
+    'rx_unicast_packets': -1,
+    'tx_multicast_packets': -1,
+    'rx_multicast_packets': -1,
+    'tx_broadcast_packets': -1,
+    'rx_broadcast_packets': -1,
+}
+
+# Host statistic types summed into the memory totals of get_environment.
+_MEMORY_STAT_MAP = {
+    'STATISTIC_MEMORY_TOTAL_BYTES': 'total',
+    'STATISTIC_MEMORY_USED_BYTES': 'used',
+}
+
+# Power supply metric types used to decide a supply's status.
+_PS_FIELD_MAP = {
+    'PS_INDEX': 'index',
+    'PS_STATE': 'state',
+    'PS_INPUT_STATE': 'input_state',
+    'PS_OUTPUT_STATE': 'output_state',
+    'PS_FAN_STATE': 'fan_state',
+}
+
+# Upper bound on iControl calls in flight at once for a single getter.
+MAX_CONCURRENT_CALLS = 8
+
+# VLANs per forwarding-table request, so large VLAN lists are fetched as
+# several smaller calls. They run one after another: all of them go to the
+# same Networking.VLAN client; see _run_concurrently.
+FDB_CHUNK_SIZE = 32
+
+# Users per encrypted-password request in get_users, and the attempts made
+# at each request before the getter fails.
+USERS_CHUNK_SIZE = 50
+USERS_CHUNK_ATTEMPTS = 2
+
+# Directory ConfigSync installs single configuration files (SCF) from.
+SCF_DIR = '/var/local/scf/'
+# Bytes of SCF sent per ConfigSync.upload_file call (before base64).
+SCF_CHUNK_SIZE = 1024 * 1024
+
+# Seconds an interface list stays valid, so that getters run back to back
+# (e.g. get_facts then get_interfaces) share one device call.
+INTERFACES_TTL = 2.0
+
+# Seconds a running config stays valid. Dumping it runs tmsh on the device,
+# the slowest call the driver makes, so repeated get_config() calls within
+# one burst reuse it; loads and commits drop it straight away.
+RUNNING_CONFIG_TTL = 2.0
+
+# Default seconds the SNMP system information (contact, location and
+# description) is reused across getters; see 'snmp_cache_ttl'.
+SNMP_CACHE_TTL = 30
+
+# Interface speeds (Mbps) keyed by the rate token of an iControl media type,
+# e.g. 'MT_10000SR_FULL' -> '10000'.
+_SPEED_RE = re.compile(r'(\d+)')
+_SPEED_TABLE = {
+    '100000': 100000,
+    '40000': 40000,
+    '10000': 10000,
+    '1000': 1000,
+    '100': 100,
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _if_speed(active_media):
+    """Return the speed in Mbps advertised by an iControl media type."""
+    match = _SPEED_RE.search(active_media)
+    if match is None:
+        return -1
+    return _SPEED_TABLE.get(match.group(1), -1)
+
+
+def _convert_to_64_bit(value):
+    """ Converts two 32 bit signed integers to a 64-bit unsigned integer.
+        https://devcentral.f5.com/questions/high-and-low-bits-of-64-bit-long-and-c
+        by mhite.
+    """
+    return ((value['high'] & 0xFFFFFFFF) << 32) | (value['low'] & 0xFFFFFFFF)
+
+
+def _prefix_length(netmask):
+    """Return the prefix length of a dotted IPv4 or colon IPv6 netmask."""
+    family = socket.AF_INET6 if ':' in netmask else socket.AF_INET
+    packed = socket.inet_pton(family, netmask)
+    return bin(int.from_bytes(packed, 'big')).count('1')
+
+
+def _chunked(items, size):
+    """Split ``items`` into consecutive lists of at most ``size`` entries."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _in_sequence(*calls):
+    """Bundle calls into one that runs them in order and returns a list.
+
+    Use it to hand several calls on the same bigsuds interface to
+    _run_concurrently as a single unit.
+    """
+    return lambda: [call() for call in calls]
+
+
+def _run_concurrently(*calls):
+    """Run independent iControl calls in parallel, returning results in order.
+
+    Every call is a blocking round-trip to the device, so wall time drops
+    from the sum of the latencies to the slowest one.
+
+    Each call must use a different bigsuds interface client, such as
+    ``device.System.SystemInfo`` or ``device.Management.Device``. All the
+    methods of one suds client share a single SOAP binding, and that binding
+    keeps per-reply state while it decodes a response. Two concurrent calls
+    on one client can therefore swap or mix their results. Use _in_sequence
+    for calls on the same client. Resolve the clients on the calling thread
+    first, since bigsuds builds each one lazily, WSDL download included.
+    """
+    if not calls:
+        return []
+    with ThreadPoolExecutor(
+            max_workers=min(len(calls), MAX_CONCURRENT_CALLS)) as executor:
+        futures = [executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
 
 class F5Driver(NetworkDriver):
+    # Clients handed back by close() when 'persistent_session' is set, keyed
+    # by host, user, a password digest and the connection options, and
+    # evicted least recently used first. Reusing them skips the WSDL
+    # downloads and TLS/auth setup of a fresh connection.
+    _SESSION_POOL = OrderedDict()
+    _SESSION_POOL_SIZE = 32
+    _SESSION_POOL_LOCK = threading.Lock()
+
     def __init__(self, hostname, username, password, timeout=60,
                  optional_args=None):
         self.hostname = hostname
@@ -36,22 +202,111 @@ class F5Driver(NetworkDriver):
         self.config_replace = False
         self.filename = None
         self.device = None
+        self.devices = None
+        self.mgmt = None
+        self._cache = {}
+        self._perf_calls = Counter()
+        self._perf_seconds = Counter()
+        self._configured = False
+        self._connect_lock = threading.Lock()
 
         if optional_args is None:
             optional_args = {}
 
+        self.persistent_session = optional_args.get('persistent_session',
+                                                    False)
+        self.lazy_open = optional_args.get('lazy_open', False)
+        self.snmp_cache_ttl = optional_args.get('snmp_cache_ttl',
+                                                SNMP_CACHE_TTL)
+        if isinstance(self.snmp_cache_ttl, bool) or \
+                not isinstance(self.snmp_cache_ttl, (int, float)) or \
+                self.snmp_cache_ttl < 0:
+            raise ValueError("'snmp_cache_ttl' must be a number of seconds >= 0, "
+                             "got {!r}".format(self.snmp_cache_ttl))
+        self.token = optional_args.get('token', False)
+        if optional_args.get('profile', False):
+            self._profile_methods()
+
+    @property
+    def device(self):
+        """bigsuds client; with 'lazy_open' it connects on first access."""
+        if self._device is None and self._configured:
+            with self._connect_lock:
+                if self._device is None and self._configured:
+                    self._connect()
+        return self._device
+
+    @device.setter
+    def device(self, device):
+        self._device = device
+
+    def _session_key(self):
+        # Only a digest of the password is kept in the process-wide pool.
+        digest = hashlib.sha256(self.password.encode('utf-8')).hexdigest()
+        return self.hostname, self.username, digest, self.timeout, self.token
+
     def open(self):
+        self._cache = {}
+        self._close_rest_session(self.mgmt)
+        self.device, self.mgmt = None, None
+        if self.lazy_open:
+            self._configured = True
+        else:
+            self._connect()
+
+    def _connect(self):
+        if self.persistent_session:
+            with self._SESSION_POOL_LOCK:
+                self._device, self.mgmt = self._SESSION_POOL.pop(
+                    self._session_key(), (None, None))
+            if self._device is not None:
+                try:
+                    self.devices = self._device.Management.Device.get_list()
+                    return
+                except (bigsuds.OperationFailed, EnvironmentError):
+                    # The pooled connection went stale, start a fresh one.
+                    self._close_rest_session(self.mgmt)
+                    self._device, self.mgmt = None, None
         try:
-            self.device = bigsuds.BIGIP(hostname=self.hostname,
-                                        username=self.username,
-                                        password=self.password
-                                        )
-            self.devices = self.device.Management.Device.get_list()
-        except bigsuds.OperationFailed as err:
+            self._device = bigsuds.BIGIP(hostname=self.hostname,
+                                         username=self.username,
+                                         password=self.password
+                                         )
+            self.devices = self._device.Management.Device.get_list()
+        except (bigsuds.OperationFailed, EnvironmentError) as err:
+            # Leave the driver closed, so is_alive() reports the failure.
+            self._device = None
+            self._configured = False
             raise ConnectionException('ConfigSync API Error ({})'.format(err))
 
+    def close(self):
+        if self.persistent_session and self._device is not None:
+            key = self._session_key()
+            with self._SESSION_POOL_LOCK:
+                pool = self._SESSION_POOL
+                dropped = [pool.pop(key)] if key in pool else []
+                pool[key] = (self._device, self.mgmt)
+                while len(pool) > self._SESSION_POOL_SIZE:
+                    dropped.append(pool.popitem(last=False)[1])
+            # Replaced and evicted clients would otherwise leak their sockets.
+            for _, mgmt in dropped:
+                self._close_rest_session(mgmt)
+        else:
+            self._close_rest_session(self.mgmt)
+        self._cache = {}
+        self._configured = False
+        self.device, self.mgmt = None, None
+
+    def __del__(self):
+        # NetworkDriver closes drivers that are garbage collected while still
+        # open. Only an explicit close() hands clients back to the pool, so
+        # a forgotten driver releases its clients instead.
+        self.persistent_session = False
+        super(F5Driver, self).__del__()
+
     def load_replace_candidate(self, filename=None, config=None):
         self.config_replace = True
+        self._invalidate_cache('interfaces', 'running_config')
 
         if config:
             raise NotImplementedError
@@ -59,17 +314,53 @@ class F5Driver(NetworkDriver):
         if filename:
             self.filename = os.path.basename(filename)
             try:
-                self._upload_scf(filename)
+                self._upload_scf(filename, SCF_DIR + self.filename)
             except Exception as err:
                 raise ReplaceConfigException('{}'.format(err))
 
+    def _get_mgmt_root(self):
+        """Return the iControl REST client, connecting on first use.
+
+        The client is kept for the session so its HTTP connection (and the
+        authentication done while constructing it) is reused across calls.
+        """
+        if self.mgmt is None:
+            self.mgmt = ManagementRoot(hostname=self.hostname,
+                                       username=self.username,
+                                       password=self.password,
+                                       timeout=self.timeout,
+                                       token=self.token)
+            session = self._rest_session()
+            session.headers['Connection'] = 'keep-alive'
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                                  max_retries=Retry(total=3,
+                                                    backoff_factor=0.3))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        return self.mgmt
+
+    def _rest_session(self):
+        """Return the requests.Session shared by all REST calls."""
+        return self.mgmt._meta_data['icr_session'].session
+
+    @staticmethod
+    def _close_rest_session(mgmt):
+        if mgmt is not None:
+            mgmt._meta_data['icr_session'].session.close()
+
+    def _get_running_config(self):
+        cmd = self._get_mgmt_root().tm.util.bash.exec_cmd(
+            'run', utilCmdArgs='-c "tmsh show running-config"')
+        return cmd.commandResult
+
     def get_config(self,retrieve='all'):
-        mgmt = ManagementRoot(hostname=self.hostname, username=self.username, password=self.password)
-        cmd = mgmt.tm.util.bash.exec_cmd('run', utilCmdArgs='-c "tmsh show running-config"')
-        return {"running": cmd.commandResult}
+        running = self._cached('running_config', self._get_running_config,
+                               ttl=RUNNING_CONFIG_TTL)
+        return {"running": running}
 
     def load_merge_candidate(self, filename=None, config=None):
         self.config_replace = False
+        self._invalidate_cache('interfaces', 'running_config')
 
         if config:
             raise NotImplementedError
@@ -77,11 +368,13 @@ class F5Driver(NetworkDriver):
         if filename:
             self.filename = os.path.basename(filename)
             try:
-                self._upload_scf(filename)
+                self._upload_scf(filename, SCF_DIR + self.filename)
             except Exception as err:
                 raise MergeConfigException('{}'.format(err))
 
     def commit_config(self):
+        self._invalidate_cache('interfaces', 'running_config', 'hostname',
+                               'snmp_system_information')
         try:
             self.device.System.ConfigSync.install_single_configuration_file(
                 filename=self.filename,
@@ -94,6 +387,7 @@ class F5Driver(NetworkDriver):
             raise CommitConfigException('{}'.format(err))
 
     def discard_config(self):
+        self._invalidate_cache('interfaces', 'running_config')
         try:
             self.device.System.ConfigSync.delete_single_configuration_file(
                 filename=self.filename
@@ -102,155 +396,187 @@ class F5Driver(NetworkDriver):
             raise DiscardConfigException('{}'.format(err))
 
     def is_alive(self):
-        if self.device:
-            return {'is_alive': True}
-        else:
-            return {'is_alive': False}
-
-    def _get_uptime(self):
-        return self.device.System.SystemInfo.get_uptime()
+        return {'is_alive': self._device is not None or self._configured}
 
-    def _get_version(self):
-        return self.device.System.SystemInfo.get_version()
-
-    def _get_serial_number(self):
-        system_information = self.device.System.SystemInfo.get_system_information()
-        chassis_serial = system_information['chassis_serial']
-        return chassis_serial
+    # The getters spend their time waiting on iControl round-trips rather
+    # than on local CPU, so the timings below are mostly device latency:
+    # concurrency and caching pay off here, micro-optimising parsing won't.
+    def _profile_methods(self):
+        """Time every NAPALM method this driver implements, on this instance.
 
-    def _get_model(self):
-        return self.device.System.SystemInfo.get_marketing_name()
+        The wrappers are instance attributes, so the class and the method
+        signatures NAPALM's tests inspect are left untouched.
+        """
+        for name in dir(NetworkDriver):
+            method = getattr(type(self), name)
+            if name.startswith('_') or not callable(method) or \
+                    method is getattr(NetworkDriver, name):
+                continue
+            setattr(self, name, self._timed(name, getattr(self, name)))
+
+    def _timed(self, label, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._perf_calls[label] += 1
+                self._perf_seconds[label] += time.perf_counter() - start
+        return timed
 
-    def _get_hostname(self):
-        return self.device.Management.Device.get_hostname(self.devices)[0]
+    @property
+    def perf_stats(self):
+        """Call counts and cumulative seconds per method timed by 'profile'.
 
-    def get_facts(self):
-        facts = {
-            'uptime': self._get_uptime(),
-            'vendor': 'F5 Networks',
-            'model': self._get_model(),
-            'hostname': self._get_hostname(),
-            'fqdn': self._get_hostname(),
-            'os_version': self._get_version(),
-            'serial_number': self._get_serial_number(),
-            'interface_list': self._get_interfaces_list()
+        Empty unless the driver was built with the 'profile' optional arg.
+        """
+        return {
+            label: {'calls': calls, 'seconds': self._perf_seconds[label]}
+            for label, calls in self._perf_calls.items()
         }
-        return facts
 
-    def _get_interfaces_list(self):
-        interfaces = self.device.Networking.Interfaces.get_list()
-        return interfaces
+    def _cached(self, key, fetch, ttl=None):
+        """Return ``fetch()``, memoized under ``key``.
 
-    def _get_interfaces_enabled_state(self, interfaces):
-        enabled_state = self.device.Networking.Interfaces.get_enabled_state(
-            interfaces)
-        return enabled_state
+        Entries live until the next open() unless ``ttl`` (seconds) is given.
+        """
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and (entry[0] is None or now < entry[0]):
+            return entry[1]
+        value = fetch()
+        self._cache[key] = (None if ttl is None else now + ttl, value)
+        return value
 
-    def _get_interfaces_mac_address(self, interfaces):
-        mac_address = self.device.Networking.Interfaces.get_mac_address(
-            interfaces)
-        return mac_address
+    def _invalidate_cache(self, *keys):
+        for key in keys:
+            self._cache.pop(key, None)
 
-    def _get_interfaces_active_media(self, interfaces):
-        active_media = self.device.Networking.Interfaces.get_active_media(
-            interfaces)
-        return active_media
+    def _get_device_system_information(self, sys_info_api):
+        return self._cached('system_information',
+                            sys_info_api.get_system_information)
 
-    def _get_interfaces_media_status(self, interfaces):
-        media_status = self.device.Networking.Interfaces.get_media_status(
-            interfaces)
-        return media_status
+    def _get_version(self, sys_info_api):
+        return self._cached('version', sys_info_api.get_version)
 
-    def _get_interfaces_description(self, interfaces):
-        description = self.device.Networking.Interfaces.get_description(
-            interfaces)
-        return description
+    def _get_serial_number(self, sys_info_api):
+        system_information = self._get_device_system_information(sys_info_api)
+        chassis_serial = system_information['chassis_serial']
+        return chassis_serial
 
-    def _get_interfaces_all_statistics(self):
-        statistcs = self.device.Networking.Interfaces.get_all_statistics()
-        return statistcs
+    def _get_model(self, sys_info_api):
+        return self._cached('model', sys_info_api.get_marketing_name)
 
-    def _get_active_media(self, interfaces):
-        active_media = self.device.Networking.Interfaces.get_active_media(
-            interfaces)
-        return active_media
+    def _get_hostname(self, device_api):
+        return self._cached(
+            'hostname', lambda: device_api.get_hostname(self.devices)[0])
 
-    def _get_system_information(self):
-        system_information = self.device.Management.SNMPConfiguration.get_system_information()
-        return system_information
+    def get_facts(self):
+        # bigsuds builds each iControl client (fetching its WSDL) on first
+        # attribute access, which is not safe to race, so resolve them here
+        # before handing their methods to the worker threads. Calls on the
+        # same client run in sequence; see _run_concurrently.
+        sys_info_api = self.device.System.SystemInfo
+        device_api = self.device.Management.Device
+        iface_api = self.device.Networking.Interfaces
+        (uptime, model, version, serial_number), hostname, interfaces = \
+            _run_concurrently(
+                _in_sequence(
+                    sys_info_api.get_uptime,
+                    functools.partial(self._get_model, sys_info_api),
+                    functools.partial(self._get_version, sys_info_api),
+                    functools.partial(self._get_serial_number, sys_info_api),
+                ),
+                functools.partial(self._get_hostname, device_api),
+                functools.partial(self._get_interfaces_list, iface_api),
+            )
+        facts = {
+            'uptime': uptime,
+            'vendor': 'F5 Networks',
+            'model': model,
+            'hostname': hostname,
+            'fqdn': hostname,
+            'os_version': version,
+            'serial_number': serial_number,
+            # A copy, so callers cannot alter the cached list.
+            'interface_list': list(interfaces)
+        }
+        return facts
+
+    def _get_interfaces_list(self, iface_api):
+        return self._cached('interfaces', iface_api.get_list,
+                            ttl=INTERFACES_TTL)
 
     def get_snmp_information(self):
-        sys_info = self._get_system_information()
+        snmp_api = self.device.Management.SNMPConfiguration
+        sys_info = self._cached('snmp_system_information',
+                                snmp_api.get_system_information,
+                                ttl=self.snmp_cache_ttl)
+        ro_comm = snmp_api.get_readonly_community()
+        rw_comm = snmp_api.get_readwrite_community()
         snmp_info = {
             'contact': sys_info['sys_contact'] or '',
             'location': sys_info['sys_location'] or '',
             'chassis_id': sys_info['sys_description'] or '',
-            'community': {},
+            'community': {
+                x['community']: {
+                    'acl': x['source'] or 'N/A',
+                    'mode': mode,
+                } for mode, communities in (('ro', ro_comm), ('rw', rw_comm))
+                for x in communities
+            },
         }
-        ro_comm = self.device.Management.SNMPConfiguration.get_readonly_community()
-        rw_comm = self.device.Management.SNMPConfiguration.get_readwrite_community()
-
-        for x in ro_comm:
-            snmp_info['community'][x['community']] = {
-                'acl': x['source'] or 'N/A',
-                'mode': 'ro',
-            }
-
-        for x in rw_comm:
-            snmp_info['community'][x['community']] = {
-                'acl': x['source'] or 'N/A',
-                'mode': 'rw',
-            }
 
         return snmp_info
 
     def get_mac_address_table(self):
-        vlan_list = self.device.Networking.VLAN.get_list()
-        vlan_ids = self.device.Networking.VLAN.get_vlan_id(vlan_list)
-        dynamic_mac_list = self.device.Networking.VLAN.get_dynamic_forwarding(
-            vlan_list)
-        static_mac_list = self.device.Networking.VLAN.get_static_forwarding(
-            vlan_list)
-
-        mac_list = list()
-
-        for vlan_id, vlan, dynamic_entry in zip(vlan_ids, vlan_list,
-                                                dynamic_mac_list):
-            for fdb in dynamic_entry:
-                mac_list.append(
-                    {
-                        'mac': fdb['mac_address'],
-                        'interface': vlan,
-                        'vlan': vlan_id,
-                        'static': False,
-                        'active': True,
-                        'moves': 0,
-                        'last_move': 0.0,
-                    }
-                )
-
-        for vlan_id, vlan, static_entry in zip(vlan_ids, vlan_list,
-                                               static_mac_list):
-            for fdb in static_entry:
-                mac_list.append(
-                    {
-                        'mac': fdb['mac_address'],
-                        'interface': vlan,
-                        'vlan': vlan_id,
-                        'static': True,
-                        'active': True,
-                        'moves': 0,
-                        'last_move': 0.0,
-                    }
-                )
+        vlan_api = self.device.Networking.VLAN
+        vlan_list = vlan_api.get_list()
+        vlan_ids = vlan_api.get_vlan_id(vlan_list)
+        chunks = _chunked(vlan_list, FDB_CHUNK_SIZE)
+        dynamic_mac_list = [entries for chunk in chunks
+                            for entries in vlan_api.get_dynamic_forwarding(chunk)]
+        static_mac_list = [entries for chunk in chunks
+                           for entries in vlan_api.get_static_forwarding(chunk)]
+
+        mac_list = [
+            {
+                'mac': fdb['mac_address'],
+                'interface': vlan,
+                'vlan': vlan_id,
+                'static': static,
+                'active': True,
+                'moves': 0,
+                'last_move': 0.0,
+            }
+            for static, fdb_lists in ((False, dynamic_mac_list),
+                                      (True, static_mac_list))
+            for vlan_id, vlan, entries in zip(vlan_ids, vlan_list, fdb_lists)
+            for fdb in entries
+        ]
 
         return mac_list
 
+    @staticmethod
+    def _get_encrypted_passwords(user_api, usernames):
+        """Fetch one chunk of passwords, retrying it if the call fails."""
+        for attempt in range(1, USERS_CHUNK_ATTEMPTS + 1):
+            try:
+                return user_api.get_encrypted_password(usernames)
+            except bigsuds.OperationFailed:
+                if attempt == USERS_CHUNK_ATTEMPTS:
+                    raise
+
     def get_users(self):
-        api_users = self.device.Management.UserManagement.get_list()
+        user_api = self.device.Management.UserManagement
+        api_users = user_api.get_list()
         usernames = [x['name'] for x in api_users]
-        passwords = self.device.Management.UserManagement.get_encrypted_password(
-            usernames)
+        # The chunks share one UserManagement client, so they run in sequence.
+        passwords = [password
+                     for chunk in _chunked(usernames, USERS_CHUNK_SIZE)
+                     for password in self._get_encrypted_passwords(user_api,
+                                                                   chunk)]
         users_dict = {
             username: {
                 'level': 0,
@@ -265,79 +591,67 @@ class F5Driver(NetworkDriver):
                 self.device.System.Inet.get_ntp_server_address()}
 
     def get_interfaces_ip(self):
-        def _get_prefix_length(netmask):
-            if ":" in netmask:
-                if netmask.endswith("::"):
-                    netmask = netmask.replace("::", "")
-                return sum(
-                    [bin(int(x, 16)).count("1") for x in netmask.split(":")])
-            else:
-                return sum([bin(int(x)).count("1") for x in netmask.split(".")])
-
-        net_selfs = self.device.Networking.SelfIPV2.get_list()
-        ips = self.device.Networking.SelfIPV2.get_address(net_selfs)
-        netmasks = self.device.Networking.SelfIPV2.get_netmask(net_selfs)
-        prefixes = list(map(_get_prefix_length, netmasks))
+        self_ip_api = self.device.Networking.SelfIPV2
+        net_selfs = self_ip_api.get_list()
+        ips = self_ip_api.get_address(net_selfs)
+        netmasks = self_ip_api.get_netmask(net_selfs)
 
         interfaces_ip = {}
 
-        for net_self in zip(net_selfs, ips, prefixes):
-            if ':' in net_self[1]:
-                interfaces_ip[net_self[0]] = {
-                    'ipv6': {
-                        net_self[1]: {
-                            'prefix_length': net_self[2]
-                        }
-                    }
-                }
-            else:
-                interfaces_ip[net_self[0]] = {
-                    'ipv4': {
-                        net_self[1]: {
-                            'prefix_length': net_self[2]
-                        }
-                    }
-                }
+        for net_self, ip, netmask in zip(net_selfs, ips, netmasks):
+            family = 'ipv6' if ':' in ip else 'ipv4'
+            entry = interfaces_ip.setdefault(net_self, {})
+            entry.setdefault(family, {})[ip] = {
+                'prefix_length': _prefix_length(netmask)
+            }
 
         return interfaces_ip
 
     def get_environment(self):
-        temperature_metrics = self.device.System.SystemInfo.get_temperature_metrics()
-        blade_temperature = self.device.System.SystemInfo.get_blade_temperature()
-        fan_metrics = self.device.System.SystemInfo.get_fan_metrics()
-        all_host_statistics = self.device.System.Statistics.get_all_host_statistics()
-        global_cpu = self.device.System.SystemInfo.get_global_cpu_usage_extended_information()
-        power_supply_metrics = self.device.System.SystemInfo.get_power_supply_metrics()
-        system_information = self.device.System.SystemInfo.get_system_information()
+        sys_info_api = self.device.System.SystemInfo
+        ((temperature_metrics, blade_temperature, fan_metrics, global_cpu,
+          power_supply_metrics, system_information),
+         all_host_statistics) = _run_concurrently(
+            _in_sequence(
+                sys_info_api.get_temperature_metrics,
+                sys_info_api.get_blade_temperature,
+                sys_info_api.get_fan_metrics,
+                sys_info_api.get_global_cpu_usage_extended_information,
+                sys_info_api.get_power_supply_metrics,
+                functools.partial(self._get_device_system_information,
+                                  sys_info_api),
+            ),
+            self.device.System.Statistics.get_all_host_statistics,
+        )
 
         model = "{}_{}".format(system_information['product_category'],
                                system_information['platform'])
 
         # TEMPERATURE metrics
         temperatures = dict()
-        if model in LIMITS:
+        limits = LIMITS.get(model)
+        if limits is not None:
             # Parse chassis / appliance temperatures
             for sensor in temperature_metrics['temperatures']:
                 sensor_id = sensor[0]['value']
                 sensor_value = sensor[1]['value']
 
-                sensor_max = LIMITS[model][str(sensor_id)][0]
-                sensor_location = LIMITS[model][str(sensor_id)][1]
+                sensor_max, sensor_location = limits[str(sensor_id)]
 
                 temperatures[sensor_location] = {
                     'temperature': float(sensor_value),
-                    'is_alert': True if sensor_value >= sensor_max * ALERT else False,
-                    'is_critical': True if sensor_value >= sensor_max else False,
+                    'is_alert': sensor_value >= sensor_max * ALERT,
+                    'is_critical': sensor_value >= sensor_max,
                 }
             # Parse blades' temperatures
             for sensor in blade_temperature:
                 sensor_value = sensor['temperature']
-                sensor_max = LIMITS[model][sensor['location']][0]
+                sensor_max = limits[sensor['location']][0]
 
                 temperatures[sensor['location']] = {
                     'temperature': float(sensor_value),
-                    'is_alert': True if sensor_value >= sensor_max * ALERT else False,
-                    'is_critical': True if sensor_value >= sensor_max else False,
+                    'is_alert': sensor_value >= sensor_max * ALERT,
+                    'is_critical': sensor_value >= sensor_max,
                 }
 
         # FAN metrics
@@ -345,7 +659,7 @@ class F5Driver(NetworkDriver):
         # (iControl API doesn't provide fans' locations.)
         fans = {
             fan[0]['value']: {
-                'status': True if fan[1]['value'] == 1 else False
+                'status': fan[1]['value'] == 1
             } for fan in fan_metrics['fans']
         }
 
@@ -353,7 +667,7 @@ class F5Driver(NetworkDriver):
         cpu_usage = -1
         for stat in global_cpu['statistics']:
             if stat['type'] == 'STATISTIC_CPU_INFO_ONE_MIN_AVG_USAGE_RATIO':
-                cpu_usage = self.convert_to_64_bit(stat['value'])
+                cpu_usage = _convert_to_64_bit(stat['value'])
 
         cpus = {
             '0': {'%usage':
@@ -364,40 +678,27 @@ class F5Driver(NetworkDriver):
         # Power Supply metrics
         power = dict()
         for ps in power_supply_metrics['power_supplies']:
-            for metric in ps:
-                if metric['metric_type'] == 'PS_INDEX':
-                    ps_index = metric['value']
-                elif metric['metric_type'] == 'PS_STATE':
-                    ps_state = metric['value']
-                elif metric['metric_type'] == 'PS_INPUT_STATE':
-                    ps_input_state = metric['value']
-                elif metric['metric_type'] == 'PS_OUTPUT_STATE':
-                    ps_output_state = metric['value']
-                elif metric['metric_type'] == 'PS_FAN_STATE':
-                    ps_fan_state = metric['value']
-
-            power[ps_index] = {
-                'status': True if all(v > 0 for v in
-                                      [ps_index, ps_state, ps_input_state,
-                                       ps_output_state,
-                                       ps_fan_state]) else False,
+            ps_metrics = {_PS_FIELD_MAP[metric['metric_type']]: metric['value']
+                          for metric in ps
+                          if metric['metric_type'] in _PS_FIELD_MAP}
+
+            power[ps_metrics['index']] = {
+                'status': all(ps_metrics.get(field, 0) > 0
+                              for field in _PS_FIELD_MAP.values()),
                 'output': -1.0,
                 'capacity': -1.0,
             }
 
-        total_ram = 0
-        used_ram = 0
+        ram = Counter()
         for host in all_host_statistics['statistics']:
             for stat in host['statistics']:
-                if stat['type'] == 'STATISTIC_MEMORY_TOTAL_BYTES':
-                    total_ram = total_ram + self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_MEMORY_USED_BYTES':
-                    used_ram = used_ram + self.convert_to_64_bit(stat['value'])
+                field = _MEMORY_STAT_MAP.get(stat['type'])
+                if field is not None:
+                    ram[field] += _convert_to_64_bit(stat['value'])
 
         memory = {
-            "available_ram": total_ram - used_ram,
-            "used_ram": used_ram,
+            "available_ram": ram['total'] - ram['used'],
+            "used_ram": ram['used'],
         }
 
         env_dict = {
@@ -411,12 +712,11 @@ class F5Driver(NetworkDriver):
         return env_dict
 
     def get_network_instances(self, name=''):
-        rd_list = self.device.Networking.RouteDomainV2.get_list()
-        rd_description_list = self.device.Networking.RouteDomainV2.get_description(
-            rd_list)
-        rd_id_list = self.device.Networking.RouteDomainV2.get_identifier(
-            rd_list)
-        rd_vlan_list = self.device.Networking.RouteDomainV2.get_vlan(rd_list)
+        rd_api = self.device.Networking.RouteDomainV2
+        rd_list = rd_api.get_list()
+        rd_description_list = rd_api.get_description(rd_list)
+        rd_id_list = rd_api.get_identifier(rd_list)
+        rd_vlan_list = rd_api.get_vlan(rd_list)
 
         instances = {}
 
@@ -446,155 +746,98 @@ class F5Driver(NetworkDriver):
 
     def get_interfaces_counters(self):
         try:
-            icr_statistics = self._get_interfaces_all_statistics()
+            icr_statistics = self.device.Networking.Interfaces.get_all_statistics()
         except bigsuds.OperationFailed as err:
             raise Exception('get_interfaces: {}'.format(err))
 
+        to_64_bit = _convert_to_64_bit
         counters = {}
         for x in icr_statistics['statistics']:
-            if_name = x['interface_name']
-            counters[if_name] = {}
-            counters[if_name]['tx_broadcast_packets'] = -1
-            counters[if_name]['rx_broadcast_packets'] = -1
+            if_counters = counters[x['interface_name']] = \
+                dict(_DEFAULT_COUNTERS)
 
             for stat in x['statistics']:
-                if stat['type'] == 'STATISTIC_ERRORS_IN':
-                    counters[if_name]['rx_errors'] = self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_ERRORS_OUT':
-                    counters[if_name]['tx_errors'] = self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_DROPPED_PACKETS_IN':
-                    counters[if_name]['rx_discards'] = self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_DROPPED_PACKETS_OUT':
-                    counters[if_name]['tx_discards'] = self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_BYTES_IN':
-                    counters[if_name]['rx_octets'] = self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_BYTES_OUT':
-                    counters[if_name]['tx_octets'] = self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_PACKETS_IN':
-                    counters[if_name][
-                        'rx_unicast_packets'] = self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_PACKETS_OUT':
-                    counters[if_name][
-                        'tx_unicast_packets'] = self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_MULTICASTS_IN':
-                    counters[if_name][
-                        'rx_multicast_packets'] = self.convert_to_64_bit(
-                        stat['value'])
-                elif stat['type'] == 'STATISTIC_MULTICASTS_OUT':
-                    counters[if_name][
-                        'tx_multicast_packets'] = self.convert_to_64_bit(
-                        stat['value'])
+                field = _COUNTER_MAP.get(stat['type'])
+                if field is not None:
+                    if_counters[field] = to_64_bit(stat['value'])
 
         return counters
 
     def get_interfaces(self):
-        def if_speed(active_media):
-            if '100000' in active_media:
-                return 100000
-            elif '40000' in active_media:
-                return 40000
-            elif '10000' in active_media:
-                return 10000
-            elif '1000' in active_media:
-                return 1000
-            elif '100' in active_media:
-                return 100
-            else:
-                return -1
-
         try:
-            interfaces = self._get_interfaces_list()
-            active_media = self._get_interfaces_active_media(interfaces)
-            description = self._get_interfaces_description(interfaces)
-            enabled_state = self._get_interfaces_enabled_state(interfaces)
-            mac_address = self._get_interfaces_mac_address(interfaces)
-            media_status = self._get_interfaces_media_status(interfaces)
+            iface_api = self.device.Networking.Interfaces
+            interfaces = self._get_interfaces_list(iface_api)
+            active_media = iface_api.get_active_media(interfaces)
+            description = iface_api.get_description(interfaces)
+            enabled_state = iface_api.get_enabled_state(interfaces)
+            mac_address = iface_api.get_mac_address(interfaces)
+            media_status = iface_api.get_media_status(interfaces)
         except bigsuds.OperationFailed as err:
             raise Exception('get_interfaces: {}'.format(err))
 
-        interfaces_dict = {
-            interface_name: {
-                'is_up': True if media_status == 'MEDIA_STATUS_UP' else False,
-                'is_enabled': True if enabled_state == 'STATE_ENABLED' else False,
-                'description': description,
+        interfaces_dict = {}
+        for name, status, state, descr, mac, media in zip(interfaces,
+                                                          media_status,
+                                                          enabled_state,
+                                                          description,
+                                                          mac_address,
+                                                          active_media):
+            interfaces_dict[name] = {
+                'is_up': status == 'MEDIA_STATUS_UP',
+                'is_enabled': state == 'STATE_ENABLED',
+                'description': descr,
                 'last_flapped': -1.0,
-                'speed': if_speed(active_media),
-                'mac_address': mac_address,
-            } for (
-            interface_name,
-            media_status,
-            enabled_state,
-            description,
-            mac_address,
-            active_media
-        ) in zip(
-            interfaces,
-            media_status,
-            enabled_state,
-            description,
-            mac_address,
-            active_media
-        )
-        }
+                'speed': _if_speed(media),
+                'mac_address': mac,
+            }
 
         return interfaces_dict
 
+    convert_to_64_bit = staticmethod(_convert_to_64_bit)
+
     @staticmethod
-    def convert_to_64_bit(value):
-        """ Converts two 32 bit signed integers to a 64-bit unsigned integer.
-            https://devcentral.f5.com/questions/high-and-low-bits-of-64-bit-long-and-c
-            by mhite.
+    def _encode_scf_chunk(view, start):
+        """Base64-encode the SCF chunk of ``view`` starting at ``start``.
+
+        Returns ``(payload, chain_type)``.
         """
-        high = value['high']
-        low = value['low']
-        if high < 0:
-            high = high + (1 << 32)
-        if low < 0:
-            low = low + (1 << 32)
-        value = int((high << 32) | low)
-        assert (value >= 0)
-        return value
+        size = len(view)
+        end = min(start + SCF_CHUNK_SIZE, size)
+        payload = base64.b64encode(view[start:end]).decode('ascii')
+
+        if start == 0:
+            chain_type = 'FILE_FIRST_AND_LAST' if end == size else 'FILE_FIRST'
+        else:
+            chain_type = 'FILE_LAST' if end == size else 'FILE_MIDDLE'
+        return payload, chain_type
 
-    def _upload_scf(self, fp):
+    def _upload_scf(self, fp, remote_path):
         try:
-            chunk_size = 512 * 1024
-            filename = os.path.basename(fp)
-            size = os.path.getsize(fp)
-            start = 0
-            with open(fp, 'rb') as fileobj:
-                while True:
-                    payload = base64.b64encode(fileobj.read(chunk_size))
-                    if not payload:
-                        break
-                    end = fileobj.tell()
-
-                    if start == 0 and end == size:
-                        chain_type = 'FILE_FIRST_AND_LAST'
-                    elif start == 0 and end < size:
-                        chain_type = 'FILE_FIRST'
-                    elif start > 0 and end < size:
-                        chain_type = 'FILE_MIDDLE'
-                    elif start > 0 and end == size:
-                        chain_type = 'FILE_LAST'
-
-                    self.device.System.ConfigSync.upload_file(
-                        file_name='/var/local/scf/' + filename,
+            if not os.path.getsize(fp):
+                return
+            upload_file = self.device.System.ConfigSync.upload_file
+            with open(fp, 'rb') as fileobj, \
+                    mmap.mmap(fileobj.fileno(), 0,
+                              access=mmap.ACCESS_READ) as mapped, \
+                    memoryview(mapped) as view, \
+                    ThreadPoolExecutor(max_workers=1) as encoder:
+                starts = range(0, len(view), SCF_CHUNK_SIZE)
+                pending = encoder.submit(self._encode_scf_chunk, view, 0)
+                for index in range(len(starts)):
+                    payload, chain_type = pending.result()
+                    if index + 1 < len(starts):
+                        # Encode the next chunk while this one uploads.
+                        pending = encoder.submit(self._encode_scf_chunk,
+                                                 view, starts[index + 1])
+
+                    upload_file(
+                        file_name=remote_path,
                         file_context=dict(
                             file_data=payload,
                             chain_type=chain_type
                         )
                     )
 
-                    start += len(payload)
-
         except bigsuds.OperationFailed as e:
             raise Exception('ConfigSync API Error: {}'.format(e.message))
         except EnvironmentError as e:
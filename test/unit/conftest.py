@@ -46,6 +46,13 @@ class PatchedF5Driver(f5.F5Driver):
     def open(self):
         pass
 
+    def _cached(self, key, fetch, ttl=None):
+        """Bypass the session cache, each test case has its own mocked data.
+
+        The cache itself is covered by test_cache.py.
+        """
+        return fetch()
+
 
 class FakeF5Device(BaseTestDouble):
     """F5 device test double."""
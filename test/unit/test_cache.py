@@ -0,0 +1,141 @@
+"""Tests for the driver's session cache."""
+
+import pytest
+from mock import Mock, patch
+
+from napalm_f5 import f5
+
+
+def _driver():
+    driver = f5.F5Driver('192.0.2.1', 'admin', 'admin')
+    driver.device = Mock()
+    return driver
+
+
+def _fill(driver, *keys):
+    for key in keys:
+        driver._cached(key, lambda: key)
+
+
+def test_cached_without_ttl():
+    """Entries without a ttl are reused until invalidated."""
+    driver = _driver()
+    fetch = Mock(side_effect=['first', 'second'])
+
+    with patch.object(f5.time, 'monotonic', return_value=0.0) as monotonic:
+        assert driver._cached('key', fetch) == 'first'
+        monotonic.return_value = 1e9
+        assert driver._cached('key', fetch) == 'first'
+        assert fetch.call_count == 1
+
+        driver._invalidate_cache('key')
+        assert driver._cached('key', fetch) == 'second'
+
+
+def test_cached_with_ttl():
+    """Entries with a ttl are fetched again once it has elapsed."""
+    driver = _driver()
+    fetch = Mock(side_effect=['first', 'second'])
+
+    with patch.object(f5.time, 'monotonic', return_value=100.0) as monotonic:
+        assert driver._cached('key', fetch, ttl=5) == 'first'
+        monotonic.return_value = 104.9
+        assert driver._cached('key', fetch, ttl=5) == 'first'
+        monotonic.return_value = 105.0
+        assert driver._cached('key', fetch, ttl=5) == 'second'
+    assert fetch.call_count == 2
+
+
+def test_load_and_discard_invalidate_config_data():
+    """Loading or discarding a candidate drops config-derived entries."""
+    driver = _driver()
+    for method in (driver.load_merge_candidate, driver.load_replace_candidate,
+                   driver.discard_config):
+        _fill(driver, 'interfaces', 'running_config', 'hostname', 'version')
+        method()
+        assert set(driver._cache) == {'hostname', 'version'}
+
+
+def test_commit_config_invalidates_config_data():
+    """Committing also drops the hostname and SNMP system information."""
+    driver = _driver()
+    _fill(driver, 'interfaces', 'running_config', 'hostname',
+          'snmp_system_information', 'version', 'model')
+
+    driver.commit_config()
+
+    assert set(driver._cache) == {'version', 'model'}
+
+
+def test_open_and_close_clear_cache():
+    """A new session never sees data cached by the previous one."""
+    driver = _driver()
+    with patch.object(f5.bigsuds, 'BIGIP'):
+        _fill(driver, 'version', 'interfaces')
+        driver.open()
+        assert driver._cache == {}
+
+        _fill(driver, 'version', 'interfaces')
+        driver.close()
+        assert driver._cache == {}
+
+
+def test_snmp_cache_ttl():
+    """'snmp_cache_ttl' sets how long SNMP system information is reused."""
+    driver = f5.F5Driver('192.0.2.1', 'admin', 'admin',
+                         optional_args={'snmp_cache_ttl': 0})
+    driver.device = Mock()
+    snmp_api = driver.device.Management.SNMPConfiguration
+    snmp_api.get_system_information.return_value = {
+        'sys_contact': '', 'sys_location': '', 'sys_description': ''}
+    snmp_api.get_readonly_community.return_value = []
+    snmp_api.get_readwrite_community.return_value = []
+
+    driver.get_snmp_information()
+    driver.get_snmp_information()
+
+    assert snmp_api.get_system_information.call_count == 2
+
+
+@pytest.mark.parametrize('ttl', [None, -1, '30', True])
+def test_snmp_cache_ttl_rejects_invalid_values(ttl):
+    """Only non-negative numbers of seconds are accepted."""
+    with pytest.raises(ValueError):
+        f5.F5Driver('192.0.2.1', 'admin', 'admin',
+                    optional_args={'snmp_cache_ttl': ttl})
+
+
+def test_get_facts_does_not_expose_cached_interfaces():
+    """Changing the facts' interface list leaves the cached one intact."""
+    driver = _driver()
+    driver.device.Networking.Interfaces.get_list.return_value = ['1.1', '1.2']
+    driver.device.System.SystemInfo.get_system_information.return_value = {
+        'chassis_serial': 'serial'}
+    driver.device.Management.Device.get_hostname.return_value = ['bigip']
+
+    driver.get_facts()['interface_list'].append('mgmt')
+
+    assert driver.get_facts()['interface_list'] == ['1.1', '1.2']
+
+
+def test_is_alive_returns_a_new_dict():
+    """Changing one is_alive() result does not affect later calls."""
+    driver = _driver()
+    driver.is_alive()['is_alive'] = False
+
+    assert driver.is_alive() == {'is_alive': True}
+
+
+def test_get_config_reuses_running_config_until_ttl():
+    """The running config is dumped once per RUNNING_CONFIG_TTL seconds."""
+    driver = _driver()
+    fetch = Mock(side_effect=['first', 'second'])
+    driver._get_running_config = fetch
+
+    with patch.object(f5.time, 'monotonic', return_value=50.0) as monotonic:
+        assert driver.get_config() == {'running': 'first'}
+        monotonic.return_value = 50.0 + f5.RUNNING_CONFIG_TTL / 2
+        assert driver.get_config() == {'running': 'first'}
+        monotonic.return_value = 50.0 + f5.RUNNING_CONFIG_TTL
+        assert driver.get_config() == {'running': 'second'}
+    assert fetch.call_count == 2
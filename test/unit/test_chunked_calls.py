@@ -0,0 +1,98 @@
+"""Tests for getters that split their iControl calls into chunks."""
+
+import pytest
+from mock import Mock
+
+from napalm_f5 import f5
+
+
+def _forwarding(kind):
+    def get_forwarding(vlans):
+        assert len(vlans) <= f5.FDB_CHUNK_SIZE
+        return [[{'mac_address': '{}-{}'.format(kind, vlan)}] for vlan in vlans]
+    return get_forwarding
+
+
+def test_run_concurrently_without_calls():
+    """No calls means no results, rather than a zero-worker pool."""
+    assert f5._run_concurrently() == []
+
+
+def test_get_mac_address_table_over_several_chunks():
+    """Chunked forwarding tables line up with their VLANs, dynamic first."""
+    vlans = ['/Common/vlan{}'.format(i) for i in range(2 * f5.FDB_CHUNK_SIZE + 5)]
+    driver = f5.F5Driver('192.0.2.1', 'admin', 'admin')
+    driver.device = Mock()
+    vlan_api = driver.device.Networking.VLAN
+    vlan_api.get_list.return_value = vlans
+    vlan_api.get_vlan_id.side_effect = lambda names: [100 + vlans.index(name)
+                                                      for name in names]
+    vlan_api.get_dynamic_forwarding.side_effect = _forwarding('dynamic')
+    vlan_api.get_static_forwarding.side_effect = _forwarding('static')
+
+    mac_table = driver.get_mac_address_table()
+
+    assert vlan_api.get_dynamic_forwarding.call_count == 3
+    assert [(m['mac'], m['interface'], m['vlan'], m['static'])
+            for m in mac_table] == [
+        ('{}-{}'.format(kind, vlan), vlan, 100 + i, kind == 'static')
+        for kind in ('dynamic', 'static')
+        for i, vlan in enumerate(vlans)
+    ]
+
+
+def test_get_users_over_several_chunks():
+    """Passwords fetched per chunk are matched back to the right users."""
+    usernames = ['user{}'.format(i) for i in range(2 * f5.USERS_CHUNK_SIZE + 1)]
+    driver = f5.F5Driver('192.0.2.1', 'admin', 'admin')
+    driver.device = Mock()
+    user_api = driver.device.Management.UserManagement
+    user_api.get_list.return_value = [{'name': name} for name in usernames]
+
+    def get_encrypted_password(names):
+        assert len(names) <= f5.USERS_CHUNK_SIZE
+        return ['hash-' + name for name in names]
+    user_api.get_encrypted_password.side_effect = get_encrypted_password
+
+    users = driver.get_users()
+
+    assert user_api.get_encrypted_password.call_count == 3
+    assert list(users) == usernames
+    assert all(users[name]['password'] == 'hash-' + name for name in usernames)
+
+
+def _users_driver(usernames, get_encrypted_password):
+    driver = f5.F5Driver('192.0.2.1', 'admin', 'admin')
+    driver.device = Mock()
+    user_api = driver.device.Management.UserManagement
+    user_api.get_list.return_value = [{'name': name} for name in usernames]
+    user_api.get_encrypted_password.side_effect = get_encrypted_password
+    return driver, user_api
+
+
+def test_get_users_retries_a_failed_chunk():
+    """A chunk that fails once is retried without failing the getter."""
+    usernames = ['user{}'.format(i) for i in range(f5.USERS_CHUNK_SIZE + 1)]
+    failures = [f5.bigsuds.OperationFailed('connection reset')]
+
+    def get_encrypted_password(names):
+        if names == usernames[f5.USERS_CHUNK_SIZE:] and failures:
+            raise failures.pop()
+        return ['hash-' + name for name in names]
+    driver, user_api = _users_driver(usernames, get_encrypted_password)
+
+    users = driver.get_users()
+
+    assert user_api.get_encrypted_password.call_count == 3
+    assert all(users[name]['password'] == 'hash-' + name for name in usernames)
+
+
+def test_get_users_gives_up_after_the_last_attempt():
+    """A chunk that keeps failing fails the getter."""
+    def get_encrypted_password(names):
+        raise f5.bigsuds.OperationFailed('connection reset')
+    driver, user_api = _users_driver(['admin'], get_encrypted_password)
+
+    with pytest.raises(f5.bigsuds.OperationFailed):
+        driver.get_users()
+    assert user_api.get_encrypted_password.call_count == f5.USERS_CHUNK_ATTEMPTS
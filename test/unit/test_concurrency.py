@@ -0,0 +1,52 @@
+"""Tests that getters never overlap calls on one iControl client."""
+
+import inspect
+import threading
+import time
+
+import pytest
+
+from conftest import PatchedF5Driver
+
+
+def _exclusive(method, lock):
+    def call(*args, **kwargs):
+        if not lock.acquire(blocking=False):
+            raise AssertionError('concurrent calls on one iControl client')
+        try:
+            # Widen the window in which an overlapping call would show up.
+            time.sleep(0.005)
+            return method(*args, **kwargs)
+        finally:
+            lock.release()
+    return call
+
+
+def _guard_clients(device):
+    """Make every client method fail if its client is already busy."""
+    for namespace in (device.Management, device.Networking, device.System):
+        for client in namespace._mock_children.values():
+            lock = threading.Lock()
+            for name, method in list(vars(client).items()):
+                if inspect.ismethod(method):
+                    setattr(client, name, _exclusive(method, lock))
+
+
+@pytest.mark.parametrize('getter, test_case', [
+    ('get_facts', 'normal'),
+    ('get_environment', '12000_D111'),
+    ('get_interfaces', 'normal'),
+    ('get_interfaces_ip', 'normal'),
+    ('get_mac_address_table', 'normal'),
+    ('get_network_instances', 'normal'),
+    ('get_snmp_information', 'normal'),
+    ('get_users', 'normal'),
+])
+def test_calls_on_one_client_run_in_sequence(getter, test_case):
+    """Concurrent calls on one suds client can swap their replies."""
+    driver = PatchedF5Driver('192.0.2.1', 'admin', 'admin')
+    driver.device.current_test = 'test_' + getter
+    driver.device.current_test_case = test_case
+    _guard_clients(driver.device)
+
+    assert getattr(driver, getter)()
@@ -0,0 +1,39 @@
+"""Tests for the 'lazy_open' optional argument."""
+
+import pytest
+from mock import patch
+
+from napalm_f5 import f5
+
+
+def _driver():
+    return f5.F5Driver('192.0.2.1', 'admin', 'admin',
+                       optional_args={'lazy_open': True})
+
+
+def test_lazy_open_does_not_connect():
+    """open() leaves the device alone until a client is needed."""
+    driver = _driver()
+    with patch.object(f5.bigsuds, 'BIGIP') as bigip:
+        driver.open()
+        assert not bigip.called
+        assert driver.is_alive() == {'is_alive': True}
+
+        assert driver.device is bigip.return_value
+    assert bigip.call_count == 1
+
+
+def test_failed_lazy_connect_closes_driver():
+    """A first connect that fails raises and leaves the driver closed."""
+    driver = _driver()
+    with patch.object(f5.bigsuds, 'BIGIP') as bigip:
+        bigip.return_value.Management.Device.get_list.side_effect = \
+            EnvironmentError('connection refused')
+        driver.open()
+
+        with pytest.raises(f5.ConnectionException):
+            driver.device
+
+        assert driver.is_alive() == {'is_alive': False}
+        assert driver.device is None
+    assert bigip.call_count == 1
@@ -0,0 +1,56 @@
+"""Tests for the 'profile' optional argument."""
+
+from mock import Mock, patch
+
+from napalm_f5 import f5
+
+
+def _driver(**optional_args):
+    driver = f5.F5Driver('192.0.2.1', 'admin', 'admin',
+                         optional_args=optional_args)
+    driver.device = Mock()
+    driver.device.Management.UserManagement.get_list.return_value = []
+    return driver
+
+
+def test_profile_times_driver_methods():
+    """Each call of a wrapped method is counted and its duration added."""
+    driver = _driver(profile=True)
+
+    with patch.object(f5.time, 'perf_counter', side_effect=[0.0, 0.5, 1.0, 1.25]):
+        driver.get_users()
+        driver.get_users()
+
+    assert driver.get_users.__name__ == 'get_users'
+    assert driver.perf_stats == {'get_users': {'calls': 2, 'seconds': 0.75}}
+
+
+def test_profile_counts_failed_calls():
+    """A method that raises is still counted."""
+    driver = _driver(profile=True)
+    driver.device.Management.UserManagement.get_list.side_effect = \
+        f5.bigsuds.OperationFailed('connection reset')
+
+    try:
+        driver.get_users()
+    except f5.bigsuds.OperationFailed:
+        pass
+
+    assert driver.perf_stats['get_users']['calls'] == 1
+
+
+def test_profile_leaves_class_untouched():
+    """Only the profiled instance gets the wrappers."""
+    driver = _driver(profile=True)
+
+    assert 'get_users' in vars(driver)
+    assert 'get_users' not in vars(_driver())
+    assert driver.get_users.__wrapped__.__func__ is f5.F5Driver.get_users
+
+
+def test_perf_stats_empty_without_profile():
+    """Without 'profile' nothing is wrapped or recorded."""
+    driver = _driver()
+    driver.get_users()
+
+    assert driver.perf_stats == {}
@@ -0,0 +1,106 @@
+"""Tests for the 'persistent_session' client pool."""
+
+from collections import OrderedDict
+import gc
+
+import pytest
+from mock import MagicMock, Mock, patch
+
+from napalm_f5 import f5
+
+
+@pytest.fixture(autouse=True)
+def pool():
+    """Give every test an empty pool of its own."""
+    # Finalize drivers left over from earlier tests before swapping pools.
+    gc.collect()
+    with patch.object(f5.F5Driver, '_SESSION_POOL', OrderedDict()) as pool:
+        yield pool
+
+
+def _driver(password='secret', timeout=60):
+    driver = f5.F5Driver('192.0.2.1', 'admin', password, timeout=timeout,
+                         optional_args={'persistent_session': True})
+    driver.device, driver.mgmt = Mock(), MagicMock()
+    return driver
+
+
+def _rest_session(mgmt):
+    return mgmt._meta_data['icr_session'].session
+
+
+def test_pool_key_does_not_hold_the_password(pool):
+    """Pooled clients are keyed on a digest, not the plain text password."""
+    _driver().close()
+
+    (key,) = pool
+    assert 'secret' not in key
+
+
+def test_pool_key_includes_connection_options(pool):
+    """Clients built with other options are not handed out."""
+    _driver(timeout=60).close()
+    _driver(timeout=5).close()
+
+    assert len(pool) == 2
+
+
+def test_close_closes_replaced_client(pool):
+    """A second driver for the same device replaces and closes the first."""
+    first, second = _driver(), _driver()
+    first_mgmt = first.mgmt
+    first.close()
+    second.close()
+
+    assert len(pool) == 1
+    assert _rest_session(first_mgmt).close.called
+
+
+def test_close_closes_evicted_client(pool):
+    """The least recently used client is closed once the pool is full."""
+    with patch.object(f5.F5Driver, '_SESSION_POOL_SIZE', 1):
+        first = _driver(password='one')
+        first_mgmt = first.mgmt
+        first.close()
+        _driver(password='two').close()
+
+    assert len(pool) == 1
+    assert _rest_session(first_mgmt).close.called
+
+
+def test_open_replaces_stale_client():
+    """A pooled client that fails is dropped for a fresh connection."""
+    stale = _driver()
+    stale_device, stale_mgmt = stale.device, stale.mgmt
+    stale_device.Management.Device.get_list.side_effect = EnvironmentError(
+        'connection reset')
+    stale.close()
+
+    driver = _driver()
+    with patch.object(f5.bigsuds, 'BIGIP') as bigip:
+        driver.open()
+
+    assert driver.device is bigip.return_value
+    assert _rest_session(stale_mgmt).close.called
+    driver.close()
+
+
+def test_open_reports_transport_errors():
+    """Transport errors on connect surface as ConnectionException."""
+    driver = _driver()
+    with patch.object(f5.bigsuds, 'BIGIP') as bigip:
+        bigip.return_value.Management.Device.get_list.side_effect = \
+            EnvironmentError('connection refused')
+        with pytest.raises(f5.ConnectionException):
+            driver.open()
+
+
+def test_garbage_collected_driver_is_not_pooled(pool):
+    """Only close() returns clients to the pool, not garbage collection."""
+    driver = _driver()
+    mgmt = driver.mgmt
+    del driver
+    gc.collect()
+
+    assert not pool
+    assert _rest_session(mgmt).close.called
@@ -0,0 +1,47 @@
+"""Tests for uploading single configuration files (SCF)."""
+
+import base64
+
+from mock import Mock, patch
+
+from napalm_f5 import f5
+
+
+def _upload(tmp_path, content):
+    scf = tmp_path / 'candidate.scf'
+    scf.write_bytes(content)
+    driver = f5.F5Driver('192.0.2.1', 'admin', 'admin')
+    driver.device = Mock()
+    upload_file = driver.device.System.ConfigSync.upload_file
+
+    with patch.object(f5, 'SCF_CHUNK_SIZE', 4):
+        driver._upload_scf(str(scf), f5.SCF_DIR + 'candidate.scf')
+
+    for call in upload_file.call_args_list:
+        assert call.kwargs['file_name'] == '/var/local/scf/candidate.scf'
+    return [call.kwargs['file_context'] for call in upload_file.call_args_list]
+
+
+def test_upload_scf_chunks(tmp_path):
+    """Files over SCF_CHUNK_SIZE are sent as a FIRST, MIDDLE..., LAST chain."""
+    content = b'ltm pool p { }\n'
+    contexts = _upload(tmp_path, content)
+
+    assert [c['chain_type'] for c in contexts] == \
+        ['FILE_FIRST', 'FILE_MIDDLE', 'FILE_MIDDLE', 'FILE_LAST']
+    assert all(isinstance(c['file_data'], str) for c in contexts)
+    assert b''.join(base64.b64decode(c['file_data'])
+                    for c in contexts) == content
+
+
+def test_upload_scf_single_chunk(tmp_path):
+    """Files up to SCF_CHUNK_SIZE are sent in one FIRST_AND_LAST call."""
+    contexts = _upload(tmp_path, b'abcd')
+
+    assert contexts == [{'file_data': base64.b64encode(b'abcd').decode('ascii'),
+                         'chain_type': 'FILE_FIRST_AND_LAST'}]
+
+
+def test_upload_scf_empty_file(tmp_path):
+    """Empty files are not uploaded at all."""
+    assert _upload(tmp_path, b'') == []